@@ -1,15 +1,21 @@
-import keyboard
-import pyperclip
-import pyautogui
+# Heavy third-party modules (pyautogui, pyperclip, pystray, PIL, cerebras, and keyboard off Windows)
+# are imported where they are first used, so startup checks run without waiting on them
 import time
 import json
 import os
 import asyncio
-from cerebras.cloud.sdk import AsyncCerebras
-import pystray
-from PIL import Image # Added import
 import logging
 import sys
+import threading
+import itertools
+import ctypes
+import importlib
+import functools
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pystray
+    from cerebras.cloud.sdk import AsyncCerebras
 
 # Set up basic console logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -17,8 +23,22 @@ logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %
 # Define initial constants
 DEFAULT_HOTKEY = "left windows+y"
 DEFAULT_MODELS = ["llama3.1-8b", "llama3.1-70b"]
+MODELS_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models_cache.json")
+SETTINGS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "settings.json")
+MODELS_CACHE_MAX_AGE = 24 * 60 * 60 # Seconds before the cached model list is considered stale
+COPY_TIMEOUT = 0.2 # Maximum seconds to wait for Ctrl+C to update the clipboard
+COPY_POLL_INTERVAL = 0.002 # Seconds between clipboard checks while waiting for a copy
+INSERT_CHUNK_SIZE = 64 # Characters buffered from the stream before each paste
+SEND_INPUT_MAX_CHARS = 256 # Responses up to this length are typed via SendInput instead of pasted
+CLIPBOARD_RESTORE_DELAY = 0.1 # Seconds to let the target application read a paste before restoring
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 4 # Idle connections kept open to the Cerebras API
+HTTP_KEEPALIVE_EXPIRY = 300 # Seconds an idle connection is kept before being closed
+_STREAM_END = object() # Sentinel marking the end of a streamed response
 available_models = []
 current_model_name = "" # Global variable for the currently selected model
+cerebras_client = None # Shared AsyncCerebras client, created once at startup
+event_loop = None # Persistent asyncio loop running in a background thread
+action_lock = threading.Lock() # Held while a hotkey activation is in flight
 
 # --- Systray Menu Functions ---
 
@@ -36,34 +56,56 @@ def on_exit_clicked(icon, item):
     logging.info("Exit option clicked. Stopping systray icon...")
     icon.stop()
 
-def create_systray_menu(icon) -> pystray.Menu:
+def on_refresh_models_clicked(icon, item):
+    """Handles the Refresh models menu item click by refetching the model list in the background."""
+    logging.info("Refresh models option clicked.")
+    models_refresh = asyncio.run_coroutine_threadsafe(get_available_models(fallback=None), event_loop)
+    models_refresh.add_done_callback(lambda future: apply_refreshed_models(icon, future.result()))
+
+def _is_current_model(model_name: str, _item) -> bool:
+    """pystray `checked` callback, bound to a model name with functools.partial."""
+    return current_model_name == model_name
+
+def _make_model_selector(model_name: str):
+    """Returns a pystray action that selects model_name.
+
+    pystray picks the action's arguments from `__code__.co_argcount`, which
+    functools.partial objects lack, so actions must be plain functions.
+    """
+    def select(icon, _item):
+        update_selected_model(model_name, icon)
+    return select
+
+def create_systray_menu(icon) -> "pystray.Menu":
     """Creates the systray menu with dynamic model entries."""
+    import pystray
     menu_items = []
     if not available_models:
         menu_items.append(pystray.MenuItem("No models available", None, enabled=False))
     else:
         for model_name in available_models:
-            # Capture model_name by value in the lambda for action
-            # The checked lambda also needs to capture model_name correctly
             menu_items.append(pystray.MenuItem(
                 model_name,
-                lambda _, model_n=model_name: update_selected_model(model_n, icon),
-                checked=lambda _, model_n=model_name: current_model_name == model_n,
+                _make_model_selector(model_name),
+                checked=functools.partial(_is_current_model, model_name),
                 radio=True # Makes them behave like radio buttons (only one can be checked)
             ))
     
     menu_items.append(pystray.Menu.SEPARATOR)
+    menu_items.append(pystray.MenuItem("Refresh models", on_refresh_models_clicked))
     menu_items.append(pystray.MenuItem("Exit", on_exit_clicked))
     
     return pystray.Menu(*menu_items)
 
 def create_image():
+    from PIL import Image
     # Create a 64x64 black square icon as a placeholder
     image = Image.new('RGB', (64, 64), color='black')
     return image
 
-def start_systray():
-    """Initializes and runs the systray icon."""
+def start_systray(models_refresh=None):
+    """Initializes and runs the systray icon, applying a pending background model refresh when it completes."""
+    import pystray
     logging.info("Initializing Systray icon...")
     # Create the icon object first. pystray might use a default icon if no image is specified.
     icon = pystray.Icon("HAT-AU", create_image(), title="Hotkey Text Augmentation Utility")
@@ -71,35 +113,250 @@ def start_systray():
     # Create the menu, passing the icon object to it
     menu = create_systray_menu(icon)
     icon.menu = menu
+
+    if models_refresh is not None:
+        models_refresh.add_done_callback(lambda future: apply_refreshed_models(icon, future.result()))
     
     # Run the icon. This is a blocking call until icon.stop() or sys.exit()
     icon.run()
 
+# --- Clipboard Functions ---
+
+if sys.platform == "win32":
+    from ctypes import wintypes
+
+    CF_UNICODETEXT = 13
+    GMEM_MOVEABLE = 0x0002
+    CLIPBOARD_OPEN_RETRIES = 10 # Attempts to open a clipboard held by another process
+
+    _user32 = ctypes.WinDLL("user32", use_last_error=True)
+    _kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    _user32.OpenClipboard.argtypes = [wintypes.HWND]
+    _user32.OpenClipboard.restype = wintypes.BOOL
+    _user32.CloseClipboard.restype = wintypes.BOOL
+    _user32.EmptyClipboard.restype = wintypes.BOOL
+    _user32.GetClipboardData.argtypes = [wintypes.UINT]
+    _user32.GetClipboardData.restype = wintypes.HANDLE
+    _user32.SetClipboardData.argtypes = [wintypes.UINT, wintypes.HANDLE]
+    _user32.SetClipboardData.restype = wintypes.HANDLE
+    _user32.GetClipboardSequenceNumber.restype = wintypes.DWORD
+    _kernel32.GlobalAlloc.argtypes = [wintypes.UINT, ctypes.c_size_t]
+    _kernel32.GlobalAlloc.restype = wintypes.HGLOBAL
+    _kernel32.GlobalLock.argtypes = [wintypes.HGLOBAL]
+    _kernel32.GlobalLock.restype = wintypes.LPVOID
+    _kernel32.GlobalUnlock.argtypes = [wintypes.HGLOBAL]
+    _kernel32.GlobalUnlock.restype = wintypes.BOOL
+    _kernel32.GlobalFree.argtypes = [wintypes.HGLOBAL]
+    _kernel32.GlobalFree.restype = wintypes.HGLOBAL
+
+    def _open_clipboard():
+        """Opens the clipboard, retrying briefly if another process currently holds it."""
+        for _ in range(CLIPBOARD_OPEN_RETRIES):
+            if _user32.OpenClipboard(None):
+                return
+            time.sleep(0.001)
+        raise ctypes.WinError(ctypes.get_last_error())
+
+    def clipboard_paste() -> str:
+        """Returns the clipboard text using the native Win32 clipboard API."""
+        _open_clipboard()
+        try:
+            handle = _user32.GetClipboardData(CF_UNICODETEXT)
+            if not handle:
+                return ""
+            pointer = _kernel32.GlobalLock(handle)
+            if not pointer:
+                return ""
+            try:
+                return ctypes.wstring_at(pointer)
+            finally:
+                _kernel32.GlobalUnlock(handle)
+        finally:
+            _user32.CloseClipboard()
+
+    def clipboard_copy(text: str):
+        """Replaces the clipboard text using the native Win32 clipboard API."""
+        buffer = ctypes.create_unicode_buffer(text)
+        size = ctypes.sizeof(buffer)
+        _open_clipboard()
+        try:
+            _user32.EmptyClipboard()
+            handle = _kernel32.GlobalAlloc(GMEM_MOVEABLE, size)
+            if not handle:
+                raise ctypes.WinError(ctypes.get_last_error())
+            pointer = _kernel32.GlobalLock(handle)
+            if not pointer:
+                error = ctypes.WinError(ctypes.get_last_error())
+                _kernel32.GlobalFree(handle)
+                raise error
+            ctypes.memmove(pointer, buffer, size)
+            _kernel32.GlobalUnlock(handle)
+            if not _user32.SetClipboardData(CF_UNICODETEXT, handle):
+                _kernel32.GlobalFree(handle) # Ownership only transfers on success
+                raise ctypes.WinError(ctypes.get_last_error())
+        finally:
+            _user32.CloseClipboard()
+
+    def get_clipboard_sequence_number() -> int | None:
+        """Returns the Windows clipboard sequence number."""
+        return _user32.GetClipboardSequenceNumber()
+else:
+    def clipboard_paste() -> str:
+        """Returns the clipboard text via pyperclip."""
+        import pyperclip
+        return pyperclip.paste()
+
+    def clipboard_copy(text: str):
+        """Replaces the clipboard text via pyperclip."""
+        import pyperclip
+        pyperclip.copy(text)
+
+    def get_clipboard_sequence_number() -> int | None:
+        """Clipboard sequence numbers are Windows-only, so callers fall back to polling contents."""
+        return None
+
+def wait_for_clipboard_change(sequence_before: int | None) -> bool:
+    """Polls until the clipboard has been updated by a copy, returning False if COPY_TIMEOUT elapses first."""
+    deadline = time.monotonic() + COPY_TIMEOUT
+    while time.monotonic() < deadline:
+        if sequence_before is not None:
+            if get_clipboard_sequence_number() != sequence_before:
+                return True
+        elif clipboard_paste() != "":
+            return True
+        time.sleep(COPY_POLL_INTERVAL)
+    logging.debug("Timed out waiting for the clipboard to change.")
+    return False
+
+def read_clipboard_after_change() -> str:
+    """Reads the clipboard once a copy has started, retrying until COPY_TIMEOUT while the copying app holds it.
+
+    The sequence number advances on the source app's EmptyClipboard, before it has
+    set the new data and closed the clipboard again.
+    """
+    deadline = time.monotonic() + COPY_TIMEOUT
+    while True:
+        try:
+            return clipboard_paste()
+        except OSError as e:
+            if time.monotonic() >= deadline:
+                raise
+            logging.debug(f"Clipboard still busy after copy, retrying: {e}")
+            time.sleep(COPY_POLL_INTERVAL)
+
+# --- Keyboard Input Functions ---
+
+if sys.platform == "win32":
+    INPUT_KEYBOARD = 1
+    KEYEVENTF_KEYUP = 0x0002
+    KEYEVENTF_UNICODE = 0x0004
+    VK_RETURN = 0x0D
+
+    class MOUSEINPUT(ctypes.Structure):
+        _fields_ = [("dx", wintypes.LONG), ("dy", wintypes.LONG), ("mouseData", wintypes.DWORD),
+                    ("dwFlags", wintypes.DWORD), ("time", wintypes.DWORD), ("dwExtraInfo", ctypes.c_size_t)]
+
+    class KEYBDINPUT(ctypes.Structure):
+        _fields_ = [("wVk", wintypes.WORD), ("wScan", wintypes.WORD), ("dwFlags", wintypes.DWORD),
+                    ("time", wintypes.DWORD), ("dwExtraInfo", ctypes.c_size_t)]
+
+    class HARDWAREINPUT(ctypes.Structure):
+        _fields_ = [("uMsg", wintypes.DWORD), ("wParamL", wintypes.WORD), ("wParamH", wintypes.WORD)]
+
+    class _INPUTUNION(ctypes.Union):
+        _fields_ = [("mi", MOUSEINPUT), ("ki", KEYBDINPUT), ("hi", HARDWAREINPUT)]
+
+    class INPUT(ctypes.Structure):
+        _fields_ = [("type", wintypes.DWORD), ("union", _INPUTUNION)]
+
+    _user32.SendInput.argtypes = [wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int]
+    _user32.SendInput.restype = wintypes.UINT
+
+    def _key_input(virtual_key: int, scan_code: int, flags: int) -> INPUT:
+        """Builds a single keyboard INPUT structure."""
+        return INPUT(type=INPUT_KEYBOARD, union=_INPUTUNION(ki=KEYBDINPUT(wVk=virtual_key, wScan=scan_code, dwFlags=flags)))
+
+    def send_text_input(text: str) -> bool:
+        """Types text with a single SendInput batch of Unicode key events, returning True on success."""
+        inputs = []
+        for char in text.replace("\r\n", "\n"):
+            if char == "\n":
+                # Unicode key events for newlines are ignored by many applications, so press Enter instead
+                inputs.append(_key_input(VK_RETURN, 0, 0))
+                inputs.append(_key_input(VK_RETURN, 0, KEYEVENTF_KEYUP))
+                continue
+            encoded = char.encode("utf-16-le")
+            for i in range(0, len(encoded), 2): # Characters outside the BMP are sent as surrogate pairs
+                code_unit = int.from_bytes(encoded[i:i + 2], "little")
+                inputs.append(_key_input(0, code_unit, KEYEVENTF_UNICODE))
+                inputs.append(_key_input(0, code_unit, KEYEVENTF_UNICODE | KEYEVENTF_KEYUP))
+        if not inputs:
+            return True
+        input_array = (INPUT * len(inputs))(*inputs)
+        sent = _user32.SendInput(len(inputs), input_array, ctypes.sizeof(INPUT))
+        if sent != len(inputs):
+            logging.warning(f"SendInput injected {sent} of {len(inputs)} key events.")
+            return sent > 0 # Retrying a partially typed chunk via paste would duplicate text
+        return True
+else:
+    def send_text_input(text: str) -> bool:
+        """SendInput is Windows-only, so callers fall back to pasting."""
+        return False
+
 # --- Core Logic Functions ---
 
 def get_selected_text() -> str | None:
     """
     Attempts to get the currently selected text by simulating a copy command.
-    Restores original clipboard content if no text is selected or an error occurs.
+    On Windows the clipboard sequence number detects the copy, so the clipboard is
+    only read once and never needs restoring; elsewhere see _get_selected_text_by_clearing.
     """
+    import pyautogui
     logging.info("Attempting to get selected text...")
+    sequence_before = get_clipboard_sequence_number()
+    if sequence_before is None:
+        return _get_selected_text_by_clearing()
+    try:
+        pyautogui.hotkey('ctrl', 'c', _pause=False) # The clipboard poll below does the waiting
+        logging.info("Simulated Ctrl+C.")
+        if not wait_for_clipboard_change(sequence_before):
+            logging.info("No text appears to be selected or copied.")
+            return None
+
+        selected_text = read_clipboard_after_change()
+        if not selected_text:
+            logging.info("Clipboard changed but holds no text.")
+            return None
+        logging.info(f"Selected text retrieved: '{selected_text[:100]}...'")
+        return selected_text
+    except Exception as e:
+        logging.error(f"Error during text selection/copying: {e}")
+        return None
+
+def _get_selected_text_by_clearing() -> str | None:
+    """
+    Gets the selected text on platforms without a clipboard sequence number by clearing
+    the clipboard before copying. Restores original clipboard content if no text is
+    selected or an error occurs.
+    """
+    import pyautogui
     original_clipboard_content = ""
     try:
-        original_clipboard_content = pyperclip.paste()
-        pyperclip.copy("")  # Clear clipboard to detect a new copy
+        original_clipboard_content = clipboard_paste()
+        clipboard_copy("")  # Clear clipboard to detect a new copy
         
-        pyautogui.hotkey('ctrl', 'c')
+        pyautogui.hotkey('ctrl', 'c', _pause=False) # The clipboard poll below does the waiting
         logging.info("Simulated Ctrl+C.")
-        time.sleep(0.2)  # Changed from 0.1 to 0.2
+        wait_for_clipboard_change(None)
 
-        selected_text = pyperclip.paste()
+        selected_text = clipboard_paste()
 
-        # Check if anything was copied. pyperclip.copy("") might result in an empty string.
-        # Some systems/pyperclip versions might have a specific representation for an empty clipboard.
+        # Check if anything was copied. Clearing the clipboard leaves an empty string.
+        # Some systems might have a specific representation for an empty clipboard.
         # For simplicity, we assume an empty string means nothing new was copied.
         if not selected_text:
             logging.info("No text appears to be selected or copied.")
-            pyperclip.copy(original_clipboard_content)  # Restore original clipboard
+            clipboard_copy(original_clipboard_content)  # Restore original clipboard
             return None
         else:
             logging.info(f"Selected text retrieved: '{selected_text[:100]}...'")
@@ -109,67 +366,127 @@ def get_selected_text() -> str | None:
     except Exception as e:
         logging.error(f"Error during text selection/copying: {e}")
         try:
-            pyperclip.copy(original_clipboard_content) # Attempt to restore clipboard
+            clipboard_copy(original_clipboard_content) # Attempt to restore clipboard
         except Exception as e_restore:
             logging.error(f"Failed to restore clipboard content: {e_restore}")
         return None
 
-async def get_available_models() -> list[str]:
-    """Fetches available model names from the Cerebras API."""
-    client = AsyncCerebras(api_key=os.environ.get("CEREBRAS_API_KEY"))
+def load_cached_models() -> list[str] | None:
+    """Loads the model list from the disk cache, returning None if it is missing or stale."""
+    try:
+        with open(MODELS_CACHE_PATH, "r", encoding="utf-8") as cache_file:
+            cache = json.load(cache_file)
+        if time.time() - cache["timestamp"] > MODELS_CACHE_MAX_AGE:
+            logging.info("Cached model list is stale.")
+            return None
+        logging.info(f"Loaded cached models: {cache['models']}")
+        return cache["models"]
+    except FileNotFoundError:
+        logging.info("No cached model list found.")
+        return None
+    except Exception as e:
+        logging.error(f"Error reading model cache: {e}")
+        return None
+
+def save_cached_models(model_names: list[str]):
+    """Writes the model list to the disk cache along with the current timestamp."""
+    try:
+        with open(MODELS_CACHE_PATH, "w", encoding="utf-8") as cache_file:
+            json.dump({"timestamp": time.time(), "models": model_names}, cache_file)
+        logging.info("Model list cached to disk.")
+    except Exception as e:
+        logging.error(f"Error writing model cache: {e}")
+
+def load_saved_model_name() -> str | None:
+    """Loads the model selected in the previous session, if one was saved."""
+    try:
+        with open(SETTINGS_PATH, "r", encoding="utf-8") as settings_file:
+            return json.load(settings_file).get("current_model_name")
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.error(f"Error reading settings: {e}")
+        return None
+
+def save_current_model_name():
+    """Persists the currently selected model so the next session can start without a refresh."""
+    try:
+        with open(SETTINGS_PATH, "w", encoding="utf-8") as settings_file:
+            json.dump({"current_model_name": current_model_name}, settings_file)
+        logging.info(f"Saved current model: {current_model_name}")
+    except Exception as e:
+        logging.error(f"Error writing settings: {e}")
+
+async def get_available_models(fallback: list[str] | None = DEFAULT_MODELS) -> list[str] | None:
+    """Fetches available model names from the Cerebras API, returning fallback on error."""
     try:
         logging.info("Fetching available models from Cerebras API...")
-        models_response = await client.models.list()
+        models_response = await cerebras_client.models.list()
         model_names = [model.id for model in models_response.data]
         logging.info(f"Successfully fetched models: {model_names}")
+        save_cached_models(model_names)
         return model_names
     except Exception as e:
         logging.error(f"Error fetching models from Cerebras API: {e}")
-        logging.info("Using default models.")
-        return DEFAULT_MODELS
-    finally:
-        await client.close()
-        logging.info("Cerebras client closed.")
+        logging.info("Using fallback models.")
+        return fallback
+
+def apply_refreshed_models(icon, model_names: list[str] | None):
+    """Applies a refreshed model list and rebuilds the systray menu if it changed."""
+    global available_models, current_model_name
+    if not model_names or model_names == available_models:
+        return
+    available_models = model_names
+    if current_model_name not in available_models:
+        current_model_name = available_models[0]
+        logging.info(f"Default model set to: {current_model_name}")
+    icon.menu = create_systray_menu(icon)
+    icon.update_menu()
+    logging.info("Systray menu updated with refreshed models.")
 
-async def get_cerebras_completion(selected_text: str, model_name: str) -> str | None:
-    """Requests a completion from the Cerebras API for the given text and model."""
+async def get_cerebras_completion(selected_text: str, model_name: str):
+    """Streams a completion from the Cerebras API, yielding each content delta as it arrives."""
     logging.info(f"Requesting Cerebras completion for model '{model_name}'...")
-    client = AsyncCerebras(api_key=os.environ.get("CEREBRAS_API_KEY"))
-    
     messages = [
         {
             "role": "user",
             "content": selected_text
         }
     ]
-    full_response_content = ""
+    response_parts = []
 
     try:
         logging.info(f"Opening stream for Cerebras API model: {model_name}...")
-        stream = await client.chat.completions.create(
+        stream = await cerebras_client.chat.completions.create(
             messages=messages,
             model=model_name,
             stream=True,
         )
         logging.info("Stream opened. Receiving response...")
         async for chunk in stream:
-            full_response_content += (chunk.choices[0].delta.content or "")
+            delta = chunk.choices[0].delta.content
+            if delta:
+                response_parts.append(delta)
+                yield delta
         
+        full_response_content = "".join(response_parts)
         if not full_response_content.strip():
             logging.warning("Cerebras API returned an empty or whitespace-only response.")
-            return None
+            return
         
         logging.info(f"Cerebras full response received: {full_response_content[:100]}...")
-        return full_response_content
     except Exception as e:
         logging.error(f"Error during Cerebras API call or streaming: {e}")
-        return None
-    finally:
-        await client.close()
-        logging.info("Cerebras client closed after completion request.")
 
-def type_response(api_response: str):
-    """Types out the API response after simulating key presses to prepare the input field."""
+def type_response(response_deltas):
+    """Types out the streamed API response after simulating key presses to prepare the input field.
+
+    Responses of up to SEND_INPUT_MAX_CHARS characters are typed with SendInput on
+    Windows once the stream ends, leaving the clipboard untouched. Longer responses
+    switch to pasting as soon as the limit is crossed, in small batches as deltas
+    arrive, and the clipboard is restored afterwards.
+    """
+    import pyautogui
     logging.info("Preparing to type API response.")
     try:
         pyautogui.press('right')
@@ -178,18 +495,120 @@ def type_response(api_response: str):
         pyautogui.press('enter')
         logging.info("Simulated Enter press.")
         
-        time.sleep(0.1) # Ensure application is ready for paste
-        
-        pyperclip.copy(api_response)
-        logging.info("API response copied to clipboard.")
+        time.sleep(0.1) # Ensure application is ready for input
         
-        pyautogui.hotkey('ctrl', 'v')
-        logging.info("Simulated Ctrl+V (Paste).")
+        original_clipboard_content = None
+        buffer = []
+        buffered_chars = 0
+        for delta in response_deltas:
+            buffer.append(delta)
+            buffered_chars += len(delta)
+            if original_clipboard_content is None and buffered_chars > SEND_INPUT_MAX_CHARS:
+                # The response is too long to type, so paste it and restore the clipboard afterwards
+                original_clipboard_content = clipboard_paste()
+            if original_clipboard_content is not None and buffered_chars >= INSERT_CHUNK_SIZE:
+                paste_text("".join(buffer))
+                buffer.clear()
+                buffered_chars = 0
+        if buffer:
+            remaining_text = "".join(buffer)
+            if original_clipboard_content is not None or not send_text_input(remaining_text):
+                if original_clipboard_content is None:
+                    original_clipboard_content = clipboard_paste()
+                paste_text(remaining_text)
+
+        if original_clipboard_content is not None:
+            time.sleep(CLIPBOARD_RESTORE_DELAY)
+            clipboard_copy(original_clipboard_content)
+            logging.info("Original clipboard content restored.")
         
         logging.info("API response insertion simulated.")
     except Exception as e:
         logging.error(f"Error during response insertion: {e}")
 
+def paste_text(text: str):
+    """Pastes the given text at the cursor via the clipboard."""
+    import pyautogui
+    clipboard_copy(text)
+    pyautogui.hotkey('ctrl', 'v')
+    logging.debug(f"Pasted {len(text)} characters.")
+
+def create_cerebras_client() -> "AsyncCerebras":
+    """Creates the shared Cerebras client reused by every API request.
+
+    The underlying httpx client keeps connections alive between hotkey presses and
+    uses HTTP/2 when the optional `h2` package is installed, so concurrent
+    completions are multiplexed over a single connection.
+    """
+    import httpx
+    from cerebras.cloud.sdk import AsyncCerebras, DefaultAsyncHttpxClient
+    try:
+        import h2 # noqa: F401 - httpx needs it for HTTP/2
+        http2 = True
+    except ImportError:
+        logging.info("The 'h2' package is not installed; using HTTP/1.1 for the Cerebras client.")
+        http2 = False
+    logging.info("Creating shared Cerebras client...")
+    http_client = DefaultAsyncHttpxClient(
+        http2=http2,
+        limits=httpx.Limits(max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS, keepalive_expiry=HTTP_KEEPALIVE_EXPIRY),
+    )
+    return AsyncCerebras(api_key=os.environ.get("CEREBRAS_API_KEY"), http_client=http_client)
+
+async def close_cerebras_client():
+    """Closes the shared Cerebras client, if one was created."""
+    if cerebras_client is not None:
+        await cerebras_client.close()
+        logging.info("Cerebras client closed.")
+
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """Creates a libuv-based loop (winloop on Windows, uvloop elsewhere) when installed, else asyncio's default."""
+    loop_module_name = "winloop" if sys.platform == "win32" else "uvloop"
+    try:
+        loop_module = importlib.import_module(loop_module_name)
+    except ImportError:
+        logging.info(f"'{loop_module_name}' is not installed; using the default asyncio event loop.")
+        return asyncio.new_event_loop()
+    logging.info(f"Using {loop_module_name} event loop.")
+    return loop_module.new_event_loop()
+
+def start_event_loop() -> asyncio.AbstractEventLoop:
+    """Starts a persistent asyncio event loop in a daemon thread and returns it."""
+    loop = new_event_loop()
+    threading.Thread(target=loop.run_forever, name="asyncio-loop", daemon=True).start()
+    logging.info("Background asyncio event loop started.")
+    return loop
+
+def run_async(coro):
+    """Runs a coroutine on the persistent background loop and blocks until it completes."""
+    return asyncio.run_coroutine_threadsafe(coro, event_loop).result()
+
+async def _next_or_sentinel(async_gen):
+    """Awaits the next item of an async generator, returning _STREAM_END once it is exhausted."""
+    try:
+        return await async_gen.__anext__()
+    except StopAsyncIteration:
+        return _STREAM_END
+
+def iterate_async(async_gen):
+    """Iterates an async generator running on the background loop from a synchronous thread."""
+    try:
+        while True:
+            item = run_async(_next_or_sentinel(async_gen))
+            if item is _STREAM_END:
+                return
+            yield item
+    finally:
+        run_async(async_gen.aclose())
+
+def preload_modules(*module_names: str):
+    """Imports modules in a background thread so the first hotkey press does not pay for them."""
+    def _import_all():
+        for module_name in module_names:
+            importlib.import_module(module_name)
+        logging.debug(f"Preloaded modules: {', '.join(module_names)}")
+    threading.Thread(target=_import_all, name="module-preload", daemon=True).start()
+
 def check_api_key():
     """Checks if the CEREBRAS_API_KEY environment variable is set."""
     api_key = os.environ.get("CEREBRAS_API_KEY")
@@ -203,13 +622,17 @@ def check_api_key():
 # --- Hotkey Action ---
 
 def perform_action():
-    """Handles the hotkey activation, gets text, calls API, and types response."""
-    time.sleep(0.05) # Added delay to allow modifier keys to be released
-    logging.debug(f"perform_action triggered. Left Windows key pressed: {keyboard.is_pressed('left windows')}, Y key pressed: {keyboard.is_pressed('y')}")
-    logging.debug("Attempting to backspace a potentially inserted 'y' character.")
-    pyautogui.press('backspace')
-    logging.info("Hotkey activated.")
+    """Handles the hotkey activation, gets text, calls API, and types response.
+
+    Presses that arrive while a previous activation is still running are ignored,
+    so two activations never race on the clipboard or the target field.
+    """
+    if not action_lock.acquire(blocking=False):
+        logging.info("Hotkey busy with a previous activation. Press ignored.")
+        return
     try:
+        wait_for_hotkey_release()
+        logging.info("Hotkey activated.")
         selected_text = get_selected_text()
         if selected_text:
             logging.info(f"Selected text: '{selected_text[:50]}...'")
@@ -221,55 +644,150 @@ def perform_action():
 
             logging.info(f"Using model: {current_model_name}")
             
-            # Run the async API call in a way that's compatible with the current event loop
-            # If keyboard listener runs in a separate thread, a new event loop might be needed for this thread.
-            try:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                api_response = loop.run_until_complete(get_cerebras_completion(selected_text, current_model_name))
-                loop.close()
-            except RuntimeError as e: # Handles case where an event loop might already be running in the thread
-                 if "cannot start a new event loop" in str(e).lower():
-                    logging.warning(f"RuntimeError with event loop, trying existing loop: {e}")
-                    # This might happen if keyboard library's thread already has an asyncio loop.
-                    # This specific handling might need adjustment based on how keyboard lib manages threads.
-                    api_response = asyncio.run(get_cerebras_completion(selected_text, current_model_name))
-                 else:
-                    raise e
-
-
-            if api_response:
-                type_response(api_response)
+            # Stream the response from the persistent background loop, waiting only until it has
+            # non-whitespace content so that an empty response leaves the target field untouched
+            response_deltas = iterate_async(get_cerebras_completion(selected_text, current_model_name))
+            leading_deltas = []
+            for delta in response_deltas:
+                leading_deltas.append(delta)
+                if delta.strip():
+                    break
+
+            if leading_deltas and leading_deltas[-1].strip():
+                type_response(itertools.chain(leading_deltas, response_deltas))
+                response_deltas.close() # Finishes the stream if typing stopped early
             else:
                 logging.info("No response received from API.")
         else:
             logging.info("No text selected or retrieved. Action aborted.")
     except Exception as e:
         logging.error(f"An unexpected error occurred in perform_action: {e}")
+    finally:
+        action_lock.release()
+
+def on_keyboard_hotkey():
+    """Handles the hotkey from the `keyboard` library hook used on non-Windows platforms."""
+    import keyboard
+    import pyautogui
+    logging.debug(f"perform_action triggered. Left Windows key pressed: {keyboard.is_pressed('left windows')}, Y key pressed: {keyboard.is_pressed('y')}")
+    logging.debug("Attempting to backspace a potentially inserted 'y' character.")
+    pyautogui.press('backspace')
+    dispatch_hotkey()
+
+def dispatch_hotkey():
+    """Runs perform_action on the background loop's executor so the hotkey listener is never blocked."""
+    event_loop.call_soon_threadsafe(event_loop.run_in_executor, None, perform_action)
+
+# --- Hotkey Registration ---
+
+if sys.platform == "win32":
+    MOD_WIN = 0x0008
+    MOD_NOREPEAT = 0x4000
+    WM_HOTKEY = 0x0312
+    HOTKEY_ID = 1
+    HOTKEY_MODIFIERS = MOD_WIN | MOD_NOREPEAT # Win+Y, matching DEFAULT_HOTKEY
+    HOTKEY_VIRTUAL_KEY = ord('Y')
+    VK_LWIN = 0x5B
+    VK_RWIN = 0x5C
+    HOTKEY_RELEASE_TIMEOUT = 1.0 # Maximum seconds to wait for the Windows key to be released
+    HOTKEY_RELEASE_POLL_INTERVAL = 0.005 # Seconds between key state checks
+
+    _user32.RegisterHotKey.argtypes = [wintypes.HWND, ctypes.c_int, wintypes.UINT, wintypes.UINT]
+    _user32.RegisterHotKey.restype = wintypes.BOOL
+    _user32.UnregisterHotKey.argtypes = [wintypes.HWND, ctypes.c_int]
+    _user32.UnregisterHotKey.restype = wintypes.BOOL
+    _user32.GetMessageW.argtypes = [ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT, wintypes.UINT]
+    _user32.GetMessageW.restype = wintypes.BOOL
+    _user32.GetAsyncKeyState.argtypes = [ctypes.c_int]
+    _user32.GetAsyncKeyState.restype = ctypes.c_short
+
+    def wait_for_hotkey_release():
+        """Waits until both Windows keys are released, so simulated shortcuts are not sent as Win+Ctrl+...
+
+        Unlike the `keyboard` hook, RegisterHotKey does not hide the Win key from the OS.
+        """
+        deadline = time.monotonic() + HOTKEY_RELEASE_TIMEOUT
+        while _user32.GetAsyncKeyState(VK_LWIN) < 0 or _user32.GetAsyncKeyState(VK_RWIN) < 0:
+            if time.monotonic() >= deadline:
+                logging.warning("Timed out waiting for the Windows key to be released.")
+                return
+            time.sleep(HOTKEY_RELEASE_POLL_INTERVAL)
+
+    def run_hotkey_message_loop():
+        """Registers the hotkey with the OS and dispatches WM_HOTKEY messages until the thread exits."""
+        if not _user32.RegisterHotKey(None, HOTKEY_ID, HOTKEY_MODIFIERS, HOTKEY_VIRTUAL_KEY):
+            logging.error(f"Failed to register global hotkey {DEFAULT_HOTKEY}: {ctypes.WinError(ctypes.get_last_error())}")
+            return
+        logging.info("Global hotkey registered with the OS.")
+        try:
+            msg = wintypes.MSG()
+            while _user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                if msg.message == WM_HOTKEY and msg.wParam == HOTKEY_ID:
+                    dispatch_hotkey()
+        finally:
+            _user32.UnregisterHotKey(None, HOTKEY_ID)
+
+    def start_hotkey_listener():
+        """Starts the native hotkey message loop; RegisterHotKey binds to the calling thread's queue."""
+        threading.Thread(target=run_hotkey_message_loop, name="hotkey-listener", daemon=True).start()
+else:
+    def wait_for_hotkey_release():
+        """Gives the user a moment to release the hotkey's modifier keys."""
+        time.sleep(0.05)
+
+    def start_hotkey_listener():
+        """Falls back to the `keyboard` library's global hook where RegisterHotKey is unavailable."""
+        import keyboard
+        keyboard.add_hotkey(DEFAULT_HOTKEY, on_keyboard_hotkey, suppress=True)
 
 if __name__ == "__main__":
     # Basic logging is already configured at the top
     check_api_key()
+    if sys.platform == "win32":
+        preload_modules("pyautogui") # The clipboard is accessed natively, so pyperclip is unused
+    else:
+        preload_modules("pyautogui", "pyperclip")
+    event_loop = start_event_loop()
+    cerebras_client = create_cerebras_client()
     
-    logging.info("Fetching available AI models...")
-    available_models = asyncio.run(get_available_models()) # This asyncio.run is fine for setup
+    available_models = load_cached_models()
+    saved_model_name = load_saved_model_name()
+    if available_models is not None and saved_model_name in available_models:
+        # The previous selection is still valid, so the menu is only rebuilt when the user asks for it.
+        # The request still runs in the background to warm up the client's connection and update the cache.
+        models_refresh = None
+        asyncio.run_coroutine_threadsafe(get_available_models(fallback=None), event_loop)
+        current_model_name = saved_model_name
+        logging.info(f"Restored model from previous session: {current_model_name}")
+    elif available_models is not None:
+        # Refresh in the background; the request also warms up the client's connection
+        models_refresh = asyncio.run_coroutine_threadsafe(get_available_models(fallback=None), event_loop)
+    else:
+        # The blocking fetch doubles as the connection warm-up for the first hotkey
+        models_refresh = None
+        logging.info("Fetching available AI models...")
+        available_models = run_async(get_available_models())
     logging.info(f"Available models set to: {available_models}")
 
-    if available_models:
-        current_model_name = available_models[0] 
-        logging.info(f"Default model set to: {current_model_name}")
-    else:
+    if not available_models:
         logging.error("No models available (neither fetched nor default). Cannot set a current model.")
         current_model_name = "no_model_available_placeholder" 
+    elif not current_model_name:
+        current_model_name = available_models[0] 
+        logging.info(f"Default model set to: {current_model_name}")
 
     logging.info(f"Setting up global hotkey: {DEFAULT_HOTKEY}")
-    keyboard.add_hotkey(DEFAULT_HOTKEY, perform_action, suppress=True)
+    start_hotkey_listener()
     logging.info("Global hotkey listener started.")
 
     # Start the systray icon. This will block the main thread and keep the script alive
-    # for both systray interactions and the keyboard hotkey listener (which runs in a background thread).
-    start_systray()
+    # for both systray interactions and the hotkey listener (which runs in a background thread).
+    start_systray(models_refresh=models_refresh)
 
     # After start_systray() returns (because icon.stop() was called), exit the script.
     logging.info("Systray stopped. Exiting application.")
+    if current_model_name != "no_model_available_placeholder":
+        save_current_model_name()
+    run_async(close_cerebras_client())
+    event_loop.call_soon_threadsafe(event_loop.stop)
     sys.exit(0)